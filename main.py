@@ -14,20 +14,61 @@ Usage examples:
 If no API key is configured, the script will fall back to sample data so you can see the output format.
 """
 import argparse
+import asyncio
+import functools
 import os
+import re
 import sys
+import threading
 import time
+from collections import deque
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional, Tuple
 
+import httpx
+import numpy as np
+import openpyxl
 import pandas as pd
 import requests
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from dotenv import load_dotenv
 
+try:
+    # Advertise brotli only when a decoder is installed, otherwise a br body could not be decoded
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+try:
+    # C-accelerated parser for large fixtures/odds payloads; stdlib json is a drop-in fallback
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+from odds_cache import get_cache, load_team_ids, save_team_id
+
 API_BASE = "https://v3.football.api-sports.io"
 DEFAULT_MARKET = "1x2"  # match-winner market
 OUTPUT_XLSX = "odds_history.xlsx"
+ODDS_CONCURRENCY = 8  # odds requests in flight at once
+EXCEL_CHUNK_ROWS = 500  # fixtures derived and written per batch by stream_fixtures_excel
+REQUESTS_PER_MINUTE = 240  # API-SPORTS per-minute quota (plan dependent)
+RATE_LIMIT_THRESHOLD = 2  # pause when the server reports fewer calls left than this
+
+# Fixed schema of the per-fixture record built by fixture_record()
+RECORD_COLUMNS = ("DateUTC", "League", "Season", "Round", "Home", "Away", "Kickoff_Timestamp", "FixtureID", "Status",
+                  "HomeGoals", "AwayGoals", "Odds_H", "Odds_D", "Odds_A")
+ODDS_COLUMNS = ["Odds_H", "Odds_D", "Odds_A"]
+# Column order of the exported "data" sheet (as produced by build_dataframe)
+DATA_COLUMNS = [*RECORD_COLUMNS[:11], "Outcome", *ODDS_COLUMNS, "TeamSide", "TeamOdds"]
+# Fixture statuses whose prematch odds can be cached permanently
+FINAL_STATUSES = {"FT", "AET", "PEN"}
+# 1x2 outcome label -> position in the (H, D, A) triple
+OUTCOME_INDEX = {"home": 0, "1": 0, "draw": 1, "x": 1, "away": 2, "2": 2}
+
+# Shared keep-alive session for the synchronous team/fixture lookups
+SESSION = requests.Session()
 
 def log(msg: str):
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}", flush=True)
@@ -35,6 +76,63 @@ def log(msg: str):
 class APIError(Exception):
     pass
 
+class RetryableAPIError(APIError):
+    """Transient failure (rate limit, 5xx, network) – worth retrying with backoff."""
+
+class FatalAPIError(APIError):
+    """Permanent failure (missing key, 4xx) – retrying cannot help."""
+
+class RateLimiter:
+    """
+    Sliding-window limiter: at most `max_calls` acquisitions per `period` seconds, shared by the sync (requests) and async (httpx) call paths.
+    Also pauses when the server's rate-limit headers say the quota is nearly spent (see `observe`).
+    """
+    def __init__(self, max_calls: int, period: float = 60.0, threshold: int = RATE_LIMIT_THRESHOLD):
+        self.max_calls = max_calls
+        self.period = period
+        self.threshold = threshold
+        self._calls = deque()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, headers):
+        """
+        Read API-SPORTS per-minute quota headers from a response; when fewer than `threshold` calls remain,
+        hold further acquisitions for the advertised per-minute reset, never longer than one period.
+        (The daily x-ratelimit-requests-* headers are ignored: sleeping cannot restore that quota.)
+        """
+        try:
+            remaining = int(headers.get("X-RateLimit-Remaining", self.threshold))
+            reset = min(float(headers.get("X-RateLimit-Reset") or self.period), self.period)
+        except ValueError:
+            return
+        if remaining < self.threshold:
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + reset)
+
+    def _reserve(self) -> float:
+        # Take a slot if one is free (returns 0), otherwise return how long until one should be
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            while self._calls and now - self._calls[0] >= self.period:
+                self._calls.popleft()
+            if len(self._calls) < self.max_calls:
+                self._calls.append(now)
+                return 0.0
+            return self.period - (now - self._calls[0])
+
+    def acquire(self):
+        while (wait := self._reserve()) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while (wait := self._reserve()) > 0:
+            await asyncio.sleep(wait)
+
+RATE_LIMITER = RateLimiter(REQUESTS_PER_MINUTE)
+
 def parse_args():
     p = argparse.ArgumentParser(description="Export team match history with pre-match odds to Excel")
     p.add_argument("--team", required=True, help="Team name in plain text, e.g., 'Arsenal', 'FC Barcelona'")
@@ -44,6 +142,7 @@ def parse_args():
     p.add_argument("--league", default=None, help="Optional league name filter (e.g., 'Premier League')")
     p.add_argument("--season", default=None, help="Optional season (e.g., 2024)")
     p.add_argument("--out", default=OUTPUT_XLSX, help="Output Excel filename")
+    p.add_argument("--no-live-odds", action="store_true", help="Only fetch odds for finished (FT/AET/PEN) fixtures")
     return p.parse_args()
 
 def get_headers():
@@ -52,45 +151,100 @@ def get_headers():
     if not key:
         return None
     return {
-        "x-apisports-key": key
+        "x-apisports-key": key,
+        # Odds payloads are large JSON; requests/httpx transparently decompress before we parse r.content
+        "Accept-Encoding": ACCEPT_ENCODING,
     }
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=8),
-       retry=retry_if_exception_type(APIError))
+       retry=retry_if_exception_type(RetryableAPIError), reraise=True)
 def api_get(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
     headers = get_headers()
     if headers is None:
-        raise APIError("NO_API_KEY")
+        raise FatalAPIError("NO_API_KEY")
     url = f"{API_BASE}{path}"
-    r = requests.get(url, headers=headers, params=params, timeout=30)
+    RATE_LIMITER.acquire()
+    try:
+        r = SESSION.get(url, headers=headers, params=params, timeout=30)
+    except (requests.ConnectionError, requests.Timeout) as e:
+        raise RetryableAPIError(f"CONNECTION: {e}") from e
+    return parse_response(r)
+
+@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=8),
+       retry=retry_if_exception_type(RetryableAPIError), reraise=True)
+async def api_get_async(client: httpx.AsyncClient, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    # Same contract as api_get; auth headers live on the client
+    await RATE_LIMITER.acquire_async()
+    try:
+        r = await client.get(f"{API_BASE}{path}", params=params)
+    except httpx.TransportError as e:
+        raise RetryableAPIError(f"CONNECTION: {e}") from e
+    return parse_response(r)
+
+def parse_response(r) -> Dict[str, Any]:
+    # Works for both requests.Response and httpx.Response
+    RATE_LIMITER.observe(r.headers)
     if r.status_code == 429:
         # Rate limited – backoff
-        raise APIError("RATE_LIMIT")
+        raise RetryableAPIError("RATE_LIMIT")
+    if r.status_code >= 500:
+        raise RetryableAPIError(f"HTTP_{r.status_code}: {r.text[:200]}")
     if r.status_code >= 300:
-        raise APIError(f"HTTP_{r.status_code}: {r.text[:200]}")
-    data = r.json()
+        raise FatalAPIError(f"HTTP_{r.status_code}: {r.text[:200]}")
+    data = json_loads(r.content)
     return data
 
+@functools.lru_cache(maxsize=None)
 def find_team_id(team_name: str) -> Optional[int]:
+    # Team ids are stable, so a sidecar hit skips the /teams call entirely
+    cached = load_team_ids().get(team_name.casefold())
+    if cached is not None:
+        return cached
+    team_id = _search_team_id(team_name)
+    if team_id is not None:
+        try:
+            save_team_id(team_name, team_id)
+        except OSError as e:
+            # The lookup already succeeded; an unwritable cache dir must not abort the run
+            log(f"Warning: team id cache not saved: {e}")
+    return team_id
+
+def _search_team_id(team_name: str) -> Optional[int]:
     # Search teams by name (may return multiple – we pick the best exact/partial match)
     data = api_get("/teams", {"search": team_name})
     results = data.get("response", [])
     if not results:
         return None
     # Prefer exact case-insensitive match
+    target = team_name.casefold()
     for item in results:
         name = item.get("team", {}).get("name")
-        if name and name.lower() == team_name.lower():
+        if name and name.casefold() == target:
             return item.get("team", {}).get("id")
     # Fallback to first result
     return results[0].get("team", {}).get("id")
 
+@functools.lru_cache(maxsize=None)
 def list_fixtures(team_id: int, date_from: str, date_to: str, league_name: Optional[str], season: Optional[str]) -> List[Dict[str, Any]]:
+    # Persist only past windows where every match is finished; a late or live fixture would otherwise
+    # be frozen with its current status/score (and its odds never become cacheable)
+    key = [team_id, date_from, date_to, league_name, season]
+    cache = get_cache()
+    cached = cache.get_lookup("fixtures", key)
+    if cached is not None:
+        return cached
+    fixtures = _fetch_fixtures(team_id, date_from, date_to, league_name, season)
+    if (fixtures and date_to < datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            and all(is_final(f.get("fixture", {})) for f in fixtures)):
+        cache.put_lookup("fixtures", key, fixtures)
+    return fixtures
+
+def _fetch_fixtures(team_id: int, date_from: str, date_to: str, league_name: Optional[str], season: Optional[str]) -> List[Dict[str, Any]]:
     params = {
         "team": team_id,
         "from": date_from,
         "to": date_to,
-        "status": "FT,NS,1H,2H,ET,P"  # completed or scheduled
+        "status": "FT,AET,PEN,NS,1H,2H,ET,P"  # completed or scheduled
     }
     if season:
         params["season"] = season
@@ -98,158 +252,253 @@ def list_fixtures(team_id: int, date_from: str, date_to: str, league_name: Optio
     fixtures = data.get("response", [])
     # Optional filter by league name if provided
     if league_name:
-        fixtures = [f for f in fixtures if league_name.lower() in (f.get("league", {}).get("name", "").lower())]
-    # sort by date ascending
-    fixtures.sort(key=lambda x: x.get("fixture", {}).get("date", ""))
+        league_cf = league_name.casefold()
+        fixtures = [f for f in fixtures if league_cf in (f.get("league", {}).get("name") or "").casefold()]
+    # sort by date ascending; plain list sort beats a DataFrame round-trip at fixture-list sizes
+    fixtures.sort(key=lambda x: x.get("fixture", {}).get("date") or "")
     return fixtures
 
-def extract_score(ft: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
-    goals = ft.get("goals", {})
-    return goals.get("home"), goals.get("away")
+def pick_prematch_1x2(entries: List[Dict[str, Any]], kickoffs: Dict[int, str]) -> Dict[int, Tuple[Optional[float], Optional[float], Optional[float]]]:
+    """
+    For every fixture in `kickoffs` ({fixture_id: kickoff_iso}), choose the latest bookmaker snapshot not after
+    kickoff that quotes market 1x2 (Home/Draw/Away). Returns {fixture_id: (H, D, A)}.
+    """
+    result = {fid: (None, None, None) for fid in kickoffs}
+    # One flat walk of the payload into parallel columns; all selection below is vectorized
+    # val example: {"value": "Home", "odd": "1.85"}
+    flat = [
+        (entry.get("fixture", {}).get("id"), entry_pos, book_pos, book.get("update"), bet_pos, bet.get("name"),
+         val.get("value"), val.get("odd"))
+        for entry_pos, entry in enumerate(entries)
+        for book_pos, book in enumerate(entry.get("bookmakers", []))
+        for bet_pos, bet in enumerate(book.get("bets", []))
+        for val in bet.get("values", [])
+    ]
+    bdf = pd.DataFrame(flat, columns=["fixture_id", "entry", "book", "update", "bet", "bet_name", "value", "odd"])
+    bdf = bdf[bdf["fixture_id"].isin(kickoffs.keys()) & bdf["bet_name"].str.casefold().isin(["match winner", "1x2"])]
+    bdf = bdf.assign(
+        label=bdf["value"].str.strip().str.casefold().map(OUTCOME_INDEX),
+        odd=pd.to_numeric(bdf["odd"], errors="coerce"),
+        updated=pd.to_datetime(bdf["update"], format="ISO8601", utc=True, errors="coerce"),
+        kickoff=pd.to_datetime(bdf["fixture_id"].map(kickoffs), format="ISO8601", utc=True, errors="coerce"),
+    )
+    bdf = bdf[bdf["label"].notna() & (bdf["updated"] <= bdf["kickoff"])]
+    if bdf.empty:
+        return result
 
-def safe_get(d: Dict[str, Any], path: List[str], default=None):
-    cur = d
-    for p in path:
-        if isinstance(cur, dict) and p in cur:
-            cur = cur[p]
-        else:
-            return default
-    return cur
+    # One (H, D, A) row per bet snapshot; a repeated label keeps its last quote (even an unparseable one).
+    # A fixture may appear in several entries (dates/pages), so bets are identified by entry as well.
+    bdf = bdf.drop_duplicates(["fixture_id", "entry", "book", "bet", "label"], keep="last")
+    triples = bdf.pivot(index=["fixture_id", "updated", "entry", "book", "bet"], columns="label", values="odd").reindex(columns=[0, 1, 2])
+    triples = triples[triples.fillna(0).ne(0).any(axis=1)].reset_index()
+    # Latest snapshot per fixture; ties keep payload order (earlier entry/bookmaker/bet first)
+    best = (triples.sort_values(["fixture_id", "updated", "entry", "book", "bet"], ascending=[True, False, True, True, True])
+                   .groupby("fixture_id").head(1))
+    for fid, H, D, A in best[["fixture_id", 0, 1, 2]].itertuples(index=False):
+        result[fid] = tuple(None if pd.isna(v) else float(v) for v in (H, D, A))
+    return result
 
-def outcome_from_score(home_goals: Optional[int], away_goals: Optional[int]) -> Optional[str]:
-    if home_goals is None or away_goals is None:
-        return None
-    if home_goals > away_goals:
-        return "H"
-    if home_goals < away_goals:
-        return "A"
-    return "D"
+async def get_odds_for_date(client: httpx.AsyncClient, date: str, league_id: Optional[int], season: Optional[int]) -> List[Dict[str, Any]]:
+    """
+    All prematch odds entries for one UTC date (narrowed to a league/season when known), across result pages.
+    """
+    params = {"date": date, "type": "prematch"}
+    if league_id and season:
+        params["league"] = league_id
+        params["season"] = season
+    entries = []
+    page = 1
+    while True:
+        data = await api_get_async(client, "/odds", {**params, "page": page})
+        entries.extend(data.get("response", []))
+        paging = data.get("paging") or {}
+        if page >= (paging.get("total") or 1):
+            return entries
+        page += 1
 
-def pick_prematch_1x2(odds_resp: Dict[str, Any], kickoff_iso: str) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+def fetch_odds_parallel(fixtures: List[Dict[str, Any]], concurrency: int = ODDS_CONCURRENCY,
+                        live_odds: bool = True) -> Dict[int, Tuple[Optional[float], Optional[float], Optional[float]]]:
     """
-    Choose the closest bookmaker snapshot BEFORE kickoff for market 1x2 (Home/Draw/Away).
+    Fetch prematch 1x2 odds for all fixtures: one /odds query per (date, league, season) group, with up to
+    `concurrency` groups in flight on a single HTTP/2 connection. Cached fixtures are not requested.
+    Finished fixtures use the persistent cache; others are always refetched, or skipped entirely when
+    `live_odds` is False. Returns {fixture_id: (H, D, A)}.
     """
-    resp = odds_resp.get("response", [])
-    if not resp:
-        return (None, None, None)
-
-    kickoff = datetime.fromisoformat(kickoff_iso.replace("Z","+00:00"))
-    best_dt = None
-    best_triple = (None, None, None)
-
-    for fixture in resp:
-        for book in fixture.get("bookmakers", []):
-            for bet in book.get("bets", []):
-                if bet.get("name", "").lower() in ("match winner", "1x2"):
-                    for val in bet.get("values", []):
-                        # val example: {"value": "Home", "odd": "1.85"}
-                        pass
-                    # Bookmaker may have an update time
-                    updated = book.get("update", None)
-                    try:
-                        updated_dt = datetime.fromisoformat(updated.replace("Z","+00:00")) if updated else None
-                    except Exception:
-                        updated_dt = None
-                    # We need the last snapshot not after kickoff
-                    if updated_dt and updated_dt <= kickoff:
-                        # Extract odds H/D/A
-                        H = D = A = None
-                        for val in bet.get("values", []):
-                            name = (val.get("value") or "").strip().lower()
-                            try:
-                                odd = float(val.get("odd"))
-                            except Exception:
-                                odd = None
-                            if name in ("home", "1"):
-                                H = odd
-                            elif name in ("draw", "x"):
-                                D = odd
-                            elif name in ("away", "2"):
-                                A = odd
-                        if H or D or A:
-                            if (best_dt is None) or (updated_dt > best_dt):
-                                best_dt = updated_dt
-                                best_triple = (H, D, A)
-    return best_triple
-
-def get_fixture_odds_1x2(fixture_id: int, kickoff_iso: str, market: str = "1x2") -> Tuple[Optional[float], Optional[float], Optional[float]]:
-    params = {"fixture": fixture_id, "type": "prematch"}
-    data = api_get("/odds", params)
-    return pick_prematch_1x2(data, kickoff_iso)
-
-def build_dataframe(fixtures: List[Dict[str, Any]], team_name: str, fetch_odds: bool) -> pd.DataFrame:
-    rows = []
+    cache = get_cache()
+    odds = {}
+    groups: Dict[Tuple[str, Optional[int], Optional[int]], List[Dict[str, Any]]] = {}
     for f in fixtures:
         fixture = f.get("fixture", {})
+        if is_final(fixture):
+            cached = cache.get_odds(fixture.get("id"))
+        elif live_odds:
+            cached = None
+        else:
+            continue
+        if cached is not None:
+            odds[fixture.get("id")] = cached
+            continue
         league = f.get("league", {})
-        teams = f.get("teams", {})
-        date_iso = fixture.get("date")
-        fixture_id = fixture.get("id")
-        home = safe_get(f, ["teams", "home", "name"])
-        away = safe_get(f, ["teams", "away", "name"])
-        home_goals, away_goals = extract_score(f)
-        outcome = outcome_from_score(home_goals, away_goals)
-
-        H = D = A = None
-        if fetch_odds:
+        key = ((fixture.get("date") or "")[:10], league.get("id"), league.get("season"))
+        groups.setdefault(key, []).append(fixture)
+    if not groups:
+        return odds
+    headers = get_headers()
+    if headers is None:
+        raise FatalAPIError("NO_API_KEY")
+
+    async def fetch(client: httpx.AsyncClient, sem: asyncio.Semaphore, key) -> List[Dict[str, Any]]:
+        date, league_id, season = key
+        async with sem:
             try:
-                H, D, A = get_fixture_odds_1x2(fixture_id, date_iso)
-                time.sleep(0.25)  # be nice to the API
+                return await get_odds_for_date(client, date, league_id, season)
             except APIError as e:
-                if str(e) == "NO_API_KEY":
-                    fetch_odds = False  # fallback
-                else:
-                    log(f"Warning: odds for fixture {fixture_id} not fetched: {e}")
-
-        # Compute team's implied odds column (odds for the chosen team)
-        team_side = None
-        team_odds = None
-        if home and home.lower() == team_name.lower():
-            team_side = "Home"
-            team_odds = H
-        elif away and away.lower() == team_name.lower():
-            team_side = "Away"
-            team_odds = A
-
-        rows.append({
-            "DateUTC": date_iso,
-            "League": league.get("name"),
-            "Season": league.get("season"),
-            "Round": league.get("round"),
-            "Home": home,
-            "Away": away,
-            "Kickoff_Timestamp": fixture.get("timestamp"),
-            "FixtureID": fixture_id,
-            "Status": safe_get(f, ["fixture", "status", "short"]),
-            "HomeGoals": home_goals,
-            "AwayGoals": away_goals,
-            "Outcome": outcome,  # H/D/A
-            "Odds_H": H,
-            "Odds_D": D,
-            "Odds_A": A,
-            "TeamSide": team_side,
-            "TeamOdds": team_odds,
-        })
-    df = pd.DataFrame(rows)
+                log(f"Warning: odds for {date} not fetched: {e}")
+                return []
+
+    async def fetch_all():
+        sem = asyncio.Semaphore(concurrency)
+        async with httpx.AsyncClient(http2=True, headers=headers, timeout=30) as client:
+            return await asyncio.gather(*[fetch(client, sem, key) for key in groups])
+
+    # Select snapshots for every requested fixture at once, across all fetched dates
+    entries = [entry for batch in asyncio.run(fetch_all()) for entry in batch]
+    kickoffs = {fx.get("id"): fx.get("date") for group in groups.values() for fx in group}
+    odds.update(pick_prematch_1x2(entries, kickoffs))
+
+    # Odds of finished matches are immutable -> persist; anything else may still churn
+    cache.put_odds_many(
+        (fx.get("id"), *odds[fx.get("id")], fx.get("date"))
+        for group in groups.values() for fx in group
+        if any(odds[fx.get("id")]) and is_final(fx)
+    )
+    return odds
+
+def is_final(fixture: Dict[str, Any]) -> bool:
+    # Takes the inner "fixture" object of an API-FOOTBALL fixture item
+    return fixture.get("status", {}).get("short") in FINAL_STATUSES
+
+def fixture_record(f: Dict[str, Any], odds: Dict[int, Tuple[Optional[float], Optional[float], Optional[float]]]) -> tuple:
+    """
+    One fixture as a tuple in RECORD_COLUMNS order.
+    """
+    fixture = f.get("fixture", {})
+    league = f.get("league", {})
+    teams = f.get("teams", {})
+    goals = f.get("goals", {})
+    return (
+        fixture.get("date"), league.get("name"), league.get("season"), league.get("round"),
+        teams.get("home", {}).get("name"), teams.get("away", {}).get("name"),
+        fixture.get("timestamp"), fixture.get("id"), fixture.get("status", {}).get("short"),
+        goals.get("home"), goals.get("away"),
+        *odds.get(fixture.get("id"), (None, None, None)),
+    )
+
+def build_dataframe(fixtures: List[Dict[str, Any]], team_name: str,
+                    odds: Dict[int, Tuple[Optional[float], Optional[float], Optional[float]]]) -> pd.DataFrame:
+    """
+    Fixtures (plus already-fetched odds) as a frame in DATA_COLUMNS order, with Outcome/TeamSide/TeamOdds derived.
+    """
+    # Fixed-schema tuples into a preallocated list: no per-row dicts, no flattening of unused fields
+    rows = [None] * len(fixtures)
+    for i, f in enumerate(fixtures):
+        rows[i] = fixture_record(f, odds)
+    df = pd.DataFrame(rows, columns=RECORD_COLUMNS)
+    df[ODDS_COLUMNS] = df[ODDS_COLUMNS].astype(float)
     if not df.empty:
-        df["DateUTC"] = pd.to_datetime(df["DateUTC"])
+        # Derived columns in one vectorized pass; missing goals (NaN) compare False everywhere -> None
+        hg = df["HomeGoals"].to_numpy(dtype=float)
+        ag = df["AwayGoals"].to_numpy(dtype=float)
+        outcome = np.where(hg > ag, "H", np.where(hg < ag, "A", np.where(hg == ag, "D", None)))
+        df.insert(df.columns.get_loc("AwayGoals") + 1, "Outcome", outcome)  # H/D/A
+
+        # Team's implied odds column (odds for the chosen team)
+        target = team_name.casefold()
+        mask_home = df["Home"].str.casefold().eq(target).to_numpy()
+        mask_away = ~mask_home & df["Away"].str.casefold().eq(target).to_numpy()
+        df["TeamSide"] = np.where(mask_home, "Home", np.where(mask_away, "Away", None))
+        df["TeamOdds"] = np.where(mask_home, df["Odds_H"].to_numpy(dtype=float),
+                                  np.where(mask_away, df["Odds_A"].to_numpy(dtype=float), np.nan))
+
+        df["DateUTC"] = pd.to_datetime(df["DateUTC"], format="ISO8601", utc=True, cache=True)
         df.sort_values("DateUTC", inplace=True)
     return df
 
+def excel_rows(df: pd.DataFrame):
+    """
+    Yield plain-Python row tuples openpyxl can write, converting one row at a time so no copy of the frame is made.
+    """
+    for row in df.itertuples(index=False, name=None):
+        yield tuple(excel_value(v) for v in row)
+
+def excel_value(v):
+    # Excel has no timezone support (write the UTC wall time) and no NaN/NaT (write an empty cell)
+    if isinstance(v, datetime) and v.tzinfo is not None:
+        return v.astimezone(timezone.utc).replace(tzinfo=None)
+    if v is pd.NaT or (isinstance(v, float) and v != v):
+        return None
+    return v
+
 def export_excel(df: pd.DataFrame, out_path: str, team_name: str, date_from: str, date_to: str):
-    with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
-        df.to_excel(writer, sheet_name="data", index=False)
-        # Summary sheet
-        summary = {}
-        summary["Team"] = team_name
-        summary["Period"] = f"{date_from} → {date_to}"
-        summary["Matches"] = int(len(df))
-        if "Outcome" in df.columns and not df["Outcome"].isna().all():
-            summary["Wins(H/A)"] = int(((df["Outcome"]=="H") & (df["TeamSide"]=="Home")).sum() + ((df["Outcome"]=="A") & (df["TeamSide"]=="Away")).sum())
-            summary["Draws"] = int((df["Outcome"]=="D").sum())
-            summary["Losses(H/A)"] = int(((df["Outcome"]=="A") & (df["TeamSide"]=="Home")).sum() + ((df["Outcome"]=="H") & (df["TeamSide"]=="Away")).sum())
-        summary_df = pd.DataFrame([summary])
-        summary_df.to_excel(writer, sheet_name="summary", index=False)
+    # Write-only workbook streams rows to disk instead of building a styled in-memory cell model
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("data")
+    ws.append(list(df.columns))
+    for row in excel_rows(df):
+        ws.append(row)
+    # Summary sheet
+    summary = {}
+    summary["Team"] = team_name
+    summary["Period"] = f"{date_from} → {date_to}"
+    summary["Matches"] = int(len(df))
+    if "Outcome" in df.columns and not df["Outcome"].isna().all():
+        summary["Wins(H/A)"], summary["Draws"], summary["Losses(H/A)"] = outcome_counts(df)
+    write_summary(wb, summary)
+    wb.save(out_path)
+
+def outcome_counts(df: pd.DataFrame) -> Tuple[int, int, int]:
+    """
+    (wins, draws, losses) of the chosen team over the frame's Outcome/TeamSide columns.
+    """
+    # One grouping pass; dropna=False keeps draws where the team side is unknown
+    counts = df.groupby(["Outcome", "TeamSide"], dropna=False).size()
+    def n(outcome: str, side: str) -> int:
+        return int(counts.get((outcome, side), 0))
+    draws = int(counts[counts.index.get_level_values("Outcome") == "D"].sum())
+    return n("H", "Home") + n("A", "Away"), draws, n("A", "Home") + n("H", "Away")
+
+def write_summary(wb: openpyxl.Workbook, summary: Dict[str, Any]):
+    ws = wb.create_sheet("summary")
+    ws.append(list(summary.keys()))
+    ws.append(list(summary.values()))
+
+def stream_fixtures_excel(fixtures: List[Dict[str, Any]], team_name: str, out_path: str, date_from: str, date_to: str,
+                          fetch_odds: bool = True, live_odds: bool = True):
+    """
+    Write fixtures to a write-only sheet in chunks of EXCEL_CHUNK_ROWS, each derived by build_dataframe,
+    tallying the summary as we go so memory stays bounded however long the history is.
+    Fixtures are expected in date order (see list_fixtures).
+    """
+    odds = fetch_odds_parallel(fixtures, live_odds=live_odds) if fetch_odds else {}
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("data")
+    ws.append(DATA_COLUMNS)
+    wins = draws = losses = decided = 0
+    for start in range(0, len(fixtures), EXCEL_CHUNK_ROWS):
+        df = build_dataframe(fixtures[start:start + EXCEL_CHUNK_ROWS], team_name, odds)
+        for row in excel_rows(df):
+            ws.append(row)
+        decided += int(df["Outcome"].notna().sum())
+        w, d, l = outcome_counts(df)
+        wins, draws, losses = wins + w, draws + d, losses + l
+
+    summary = {"Team": team_name, "Period": f"{date_from} → {date_to}", "Matches": len(fixtures)}
+    if decided:
+        summary["Wins(H/A)"] = wins
+        summary["Draws"] = draws
+        summary["Losses(H/A)"] = losses
+    write_summary(wb, summary)
+    wb.save(out_path)
 
 def main():
     args = parse_args()
@@ -276,19 +525,25 @@ def main():
             fixtures = list_fixtures(team_id, date_from, date_to, league_name, season)
             log(f"Found fixtures: {len(fixtures)}")
             log("Fetching odds (prematch 1x2) ...")
-            df = build_dataframe(fixtures, team, fetch_odds=True)
+            stream_fixtures_excel(fixtures, team, out, date_from, date_to, live_odds=not args.no_live_odds)
         else:
             log("No API key found – using sample data (set API_FOOTBALL_KEY in .env for live data).")
             sample_path = os.path.join(os.path.dirname(__file__), "sample_data.csv")
             if not os.path.exists(sample_path):
                 log(f"Sample file not found at {sample_path}")
                 sys.exit(3)
-            df = pd.read_csv(sample_path, parse_dates=["DateUTC"])
-            df = df[(df["Home"].str.contains(team, case=False)) | (df["Away"].str.contains(team, case=False))]
-            df = df[(df["DateUTC"]>=pd.to_datetime(date_from)) & (df["DateUTC"]<=pd.to_datetime(date_to))]
-            df.sort_values("DateUTC", inplace=True)
+            df = pd.read_csv(sample_path)
+            df["DateUTC"] = pd.to_datetime(df["DateUTC"], format="ISO8601", utc=True, cache=True)
+            # Sample dates are UTC ("...Z"), so bounds must be tz-aware to compare; --to is inclusive,
+            # so the upper bound is the start of the following day (exclusive)
+            dfrom = pd.to_datetime(date_from, utc=True)
+            dto_excl = pd.to_datetime(date_to, utc=True) + pd.Timedelta(days=1)
+            team_re = re.escape(team)
+            mask = df["Home"].str.contains(team_re, case=False, regex=True) | df["Away"].str.contains(team_re, case=False, regex=True)
+            mask &= (df["DateUTC"] >= dfrom) & (df["DateUTC"] < dto_excl)
+            df = df.loc[mask].sort_values("DateUTC")
+            export_excel(df, out, team, date_from, date_to)
 
-        export_excel(df, out, team, date_from, date_to)
         log(f"Saved Excel to {out}")
     except APIError as e:
         if str(e) == "NO_API_KEY":
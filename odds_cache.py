@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Local caches for API-FOOTBALL lookups.
+
+Prematch odds are immutable once a match has finished, so they are stored permanently by fixture id
+in SQLite and reruns skip the /odds round-trip; fixture-list lookups are stored there as JSON payloads.
+Team ids are stable and kept in a per-user JSON sidecar (teams.json) so every project folder shares them.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from platformdirs import user_cache_dir
+    USER_CACHE_DIR = user_cache_dir("football-odds")
+except ImportError:
+    USER_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "football-odds")
+
+CACHE_PATH = "odds_cache.sqlite"
+TEAMS_PATH = os.path.join(USER_CACHE_DIR, "teams.json")
+
+Triple = Tuple[Optional[float], Optional[float], Optional[float]]
+
+class OddsCache:
+    def __init__(self, path: str = CACHE_PATH):
+        # Only touched from the main thread (the async odds fetch reads/writes it before and after the event loop)
+        self._conn = sqlite3.connect(path)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS odds("
+                "fixture_id INTEGER PRIMARY KEY, H REAL, D REAL, A REAL, kickoff TEXT, cached_at TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS lookups("
+                "kind TEXT, key TEXT, payload TEXT, cached_at TEXT, PRIMARY KEY (kind, key))"
+            )
+
+    def get_odds(self, fixture_id: int) -> Optional[Triple]:
+        row = self._conn.execute(
+            "SELECT H, D, A FROM odds WHERE fixture_id = ?", (fixture_id,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def put_odds_many(self, rows: Iterable[Tuple[int, Optional[float], Optional[float], Optional[float], str]]):
+        """
+        Insert (fixture_id, H, D, A, kickoff_iso) rows; existing fixtures are left untouched.
+        """
+        now = _now_iso()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO odds(fixture_id, H, D, A, kickoff, cached_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [(fid, H, D, A, kickoff, now) for fid, H, D, A, kickoff in rows],
+            )
+
+    def get_lookup(self, kind: str, key: List[Any]) -> Optional[Any]:
+        row = self._conn.execute(
+            "SELECT payload FROM lookups WHERE kind = ? AND key = ?", (kind, json.dumps(key))
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_lookup(self, kind: str, key: List[Any], payload: Any):
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lookups(kind, key, payload, cached_at) VALUES (?, ?, ?, ?)",
+                (kind, json.dumps(key), json.dumps(payload), _now_iso()),
+            )
+
+def load_team_ids(path: str = TEAMS_PATH) -> Dict[str, int]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+def save_team_id(team_name: str, team_id: int, path: str = TEAMS_PATH):
+    """
+    Add {casefolded name: id} to the sidecar, writing a temp file and renaming it so readers never see a partial file.
+    """
+    teams = load_team_ids(path)
+    teams[team_name.casefold()] = team_id
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(teams, fh, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+_cache: Optional[OddsCache] = None
+
+def get_cache() -> OddsCache:
+    global _cache
+    if _cache is None:
+        _cache = OddsCache()
+    return _cache
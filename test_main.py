@@ -0,0 +1,24 @@
+from main import pick_prematch_1x2
+
+KICKOFF = "2025-01-01T19:00:00+00:00"
+
+def odds_entry(fixture_id, update, values):
+    return {
+        "fixture": {"id": fixture_id},
+        "bookmakers": [{"id": 1, "update": update, "bets": [{"id": 1, "name": "Match Winner", "values": values}]}],
+    }
+
+def test_fixture_in_two_entries_picks_latest_snapshot():
+    # Same fixture on two result pages: positions inside each entry coincide, the later snapshot must still win
+    entries = [
+        odds_entry(7, "2025-01-01T13:00:00+00:00", [{"value": "Home", "odd": "1.5"}]),
+        odds_entry(7, "2025-01-01T10:00:00+00:00", [{"value": "Home", "odd": "2.5"}, {"value": "Away", "odd": "x"}]),
+    ]
+    assert pick_prematch_1x2(entries, {7: KICKOFF}) == {7: (1.5, None, None)}
+
+def test_snapshot_after_kickoff_is_ignored():
+    entries = [
+        odds_entry(7, "2025-01-01T20:00:00+00:00", [{"value": "Home", "odd": "9"}]),
+        odds_entry(7, "2025-01-01T12:00:00Z", [{"value": "1", "odd": "1.8"}, {"value": "X", "odd": "3.4"}, {"value": "2", "odd": "4.2"}]),
+    ]
+    assert pick_prematch_1x2(entries, {7: KICKOFF, 8: KICKOFF}) == {7: (1.8, 3.4, 4.2), 8: (None, None, None)}